@@ -47,6 +47,9 @@ public:
     // Check if a move gives check
     static bool gives_check(const Board& board, Move m);
 
+    // Count leaf nodes of the legal move tree to the given depth
+    static U64 perft(Board& board, int depth);
+
 private:
     // Internal generation helpers
     template<Color Us>
@@ -609,3 +609,23 @@ bool MoveGen::is_pseudo_legal(const Board& board, Move m) {
     Bitboard attacks = attacks_bb(pt, from, board.pieces());
     return attacks & to;
 }
+
+U64 MoveGen::perft(Board& board, int depth) {
+    if (depth == 0) return 1;
+
+    U64 nodes = 0;
+    MoveList moves;
+    generate_all(board, moves);
+
+    for (int i = 0; i < moves.size(); ++i) {
+        Move m = moves[i].move;
+        if (!is_legal(board, m)) continue;
+
+        StateInfo si;
+        board.do_move(m, si);
+        nodes += perft(board, depth - 1);
+        board.undo_move(m);
+    }
+
+    return nodes;
+}
@@ -17,7 +17,6 @@
 #include "eval.hpp"
 #include <iostream>
 #include <chrono>
-#include <functional>
 
 namespace Tests {
 
@@ -222,27 +221,6 @@ void test_perft() {
 void run_perft(int maxDepth) {
     std::cout << "=== Perft Test (Move Generation Verification) ===\n\n";
 
-    // Simple perft function (without TT)
-    std::function<U64(Board&, int)> perft = [&](Board& b, int depth) -> U64 {
-        if (depth == 0) return 1;
-
-        U64 nodes = 0;
-        MoveList moves;
-        MoveGen::generate_all(b, moves);
-
-        for (int i = 0; i < moves.size(); ++i) {
-            Move m = moves[i].move;
-            if (!MoveGen::is_legal(b, m)) continue;
-
-            StateInfo si;
-            b.do_move(m, si);
-            nodes += perft(b, depth - 1);
-            b.undo_move(m);
-        }
-
-        return nodes;
-    };
-
     // Test 1: Starting position
     {
         Board board;
@@ -251,7 +229,7 @@ void run_perft(int maxDepth) {
         std::cout << "Starting position perft:\n";
         for (int depth = 1; depth <= std::min(maxDepth, 5); ++depth) {
             auto start = std::chrono::high_resolution_clock::now();
-            U64 nodes = perft(board, depth);
+            U64 nodes = MoveGen::perft(board, depth);
             auto end = std::chrono::high_resolution_clock::now();
             auto duration = std::chrono::duration_cast<std::chrono::milliseconds>(end - start).count();
 
@@ -273,7 +251,7 @@ void run_perft(int maxDepth) {
         std::cout << "\nKiwipete position perft:\n";
         for (int depth = 1; depth <= std::min(maxDepth, 4); ++depth) {
             auto start = std::chrono::high_resolution_clock::now();
-            U64 nodes = perft(board, depth);
+            U64 nodes = MoveGen::perft(board, depth);
             auto end = std::chrono::high_resolution_clock::now();
             auto duration = std::chrono::duration_cast<std::chrono::milliseconds>(end - start).count();
 
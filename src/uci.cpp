@@ -5,7 +5,6 @@
 #include <iostream>
 #include <algorithm>
 #include <chrono>
-#include <functional>
 #include <iomanip>
 #include "tuning.hpp"
 
@@ -482,29 +481,8 @@ void UCIHandler::cmd_perft(std::istringstream& is) {
     int depth = 6;
     is >> depth;
 
-    // Perft implementation
-    std::function<U64(Board&, int)> perft = [&](Board& b, int d) -> U64 {
-        if (d == 0) return 1;
-
-        U64 nodes = 0;
-        MoveList moves;
-        MoveGen::generate_all(b, moves);
-
-        for (int i = 0; i < moves.size(); ++i) {
-            Move m = moves[i].move;
-            if (!MoveGen::is_legal(b, m)) continue;
-
-            StateInfo si;
-            b.do_move(m, si);
-            nodes += perft(b, d - 1);
-            b.undo_move(m);
-        }
-
-        return nodes;
-    };
-
     auto start = std::chrono::steady_clock::now();
-    U64 nodes = perft(board, depth);
+    U64 nodes = MoveGen::perft(board, depth);
     auto end = std::chrono::steady_clock::now();
 
     auto elapsed = std::chrono::duration_cast<std::chrono::milliseconds>(end - start).count();
@@ -527,30 +505,13 @@ void UCIHandler::cmd_divide(std::istringstream& is) {
     MoveList moves;
     MoveGen::generate_all(board, moves);
 
-    // Reuse perft lambda logic (re-defined here for simplicity)
-    std::function<U64(Board&, int)> perft_recursive = [&](Board& b, int d) -> U64 {
-        if (d == 0) return 1;
-        U64 nodes = 0;
-        MoveList mvs;
-        MoveGen::generate_all(b, mvs);
-        for (int i = 0; i < mvs.size(); ++i) {
-            Move m = mvs[i].move;
-            if (!MoveGen::is_legal(b, m)) continue;
-            StateInfo si;
-            b.do_move(m, si);
-            nodes += perft_recursive(b, d - 1);
-            b.undo_move(m);
-        }
-        return nodes;
-    };
-
     for (int i = 0; i < moves.size(); ++i) {
         Move m = moves[i].move;
         if (!MoveGen::is_legal(board, m)) continue;
 
         StateInfo si;
         board.do_move(m, si);
-        U64 nodes = perft_recursive(board, depth - 1);
+        U64 nodes = MoveGen::perft(board, depth - 1);
         board.undo_move(m);
 
         std::cout << move_to_string(m) << ": " << nodes << std::endl;
@@ -0,0 +1,33 @@
+// ============================================================================
+// Perft Shared Library
+// ============================================================================
+// Exposes move-generation perft through a C interface so tests/perft_test.py
+// can call it with ctypes instead of starting an engine process per run.
+//
+// Build: make perftlib  ->  output/libperft.so (perft.dll on Windows)
+// ============================================================================
+
+#include <mutex>
+#include <string>
+
+#include "../include/board.hpp"
+#include "../include/movegen.hpp"
+
+#ifdef _WIN32
+#define PERFT_API extern "C" __declspec(dllexport)
+#else
+#define PERFT_API extern "C" __attribute__((visibility("default")))
+#endif
+
+// Returns the number of leaf nodes at the given depth from fen
+PERFT_API unsigned long long perft_fen(const char* fen, int depth) {
+    static std::once_flag initFlag;
+    std::call_once(initFlag, Position::init);
+
+    StateInfo si;
+    Board board;
+    board.set(std::string(fen), &si);
+
+    // Same routine as the engine's "perft" command, so the two cannot disagree
+    return MoveGen::perft(board, depth);
+}
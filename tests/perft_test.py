@@ -7,109 +7,138 @@ Usage:
     python perft_test.py [--depth N] [--divide] [--position FEN]
 
 GitHub Actions:
-    python perft_test.py --depth 5 --all-positions
+    python perft_test.py --depth 5 --all-positions --fast
+
+Results are cached in tests/.perft_cache.db keyed by the engine binary
+hash; pass --no-cache to always run the engine. If `make perftlib` has
+been run, perft counts come from output/libperft.so instead of engine
+processes.
 """
 
 import subprocess
 import sys
 import argparse
 import os
+import re
+import threading
+import hashlib
+import sqlite3
+import functools
+import contextlib
+import ctypes
+import asyncio
 from dataclasses import dataclass
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # ============================================================================
 # Known Perft Values
 # Source: https://www.chessprogramming.org/Perft_Results
 # ============================================================================
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PerftPosition:
     name: str
     fen: str
-    expected: Dict[int, int]  # depth -> expected nodes
+    expected: Tuple[int, ...]  # expected nodes indexed by depth (index 0 = perft 0)
+
+    def expected_nodes(self, depth: int) -> int:
+        """Expected node count at depth, or -1 if unknown."""
+        return self.expected[depth] if 0 <= depth < len(self.expected) else -1
+
+    def known_depths(self, max_depth: int) -> List[int]:
+        """Depths 1..max_depth that have an expected value."""
+        return [d for d in range(1, max_depth + 1) if self.expected_nodes(d) >= 0]
 
-PERFT_POSITIONS = [
+PERFT_POSITIONS = (
     PerftPosition(
         name="Starting Position",
         fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
-        expected={
-            1: 20,
-            2: 400,
-            3: 8902,
-            4: 197281,
-            5: 4865609,
-            6: 119060324,
-            7: 3195901860,
-        }
+        expected=(
+            1,
+            20,
+            400,
+            8902,
+            197281,
+            4865609,
+            119060324,
+            3195901860,
+        )
     ),
     PerftPosition(
         name="Kiwipete",
         fen="r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
-        expected={
-            1: 48,
-            2: 2039,
-            3: 97862,
-            4: 4085603,
-            5: 193690690,
-            6: 8031647685,
-        }
+        expected=(
+            1,
+            48,
+            2039,
+            97862,
+            4085603,
+            193690690,
+            8031647685,
+        )
     ),
     PerftPosition(
         name="Position 3",
         fen="8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
-        expected={
-            1: 14,
-            2: 191,
-            3: 2812,
-            4: 43238,
-            5: 674624,
-            6: 11030083,
-        }
+        expected=(
+            1,
+            14,
+            191,
+            2812,
+            43238,
+            674624,
+            11030083,
+        )
     ),
     PerftPosition(
         name="Position 4",
         fen="r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
-        expected={
-            1: 6,
-            2: 264,
-            3: 9467,
-            4: 422333,
-            5: 15833292,
-            6: 706045033,
-        }
+        expected=(
+            1,
+            6,
+            264,
+            9467,
+            422333,
+            15833292,
+            706045033,
+        )
     ),
     PerftPosition(
         name="Position 5",
         fen="rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
-        expected={
-            1: 44,
-            2: 1486,
-            3: 62379,
-            4: 2103487,
-            5: 89941194,
-            6: 3581585156,
-        }
+        expected=(
+            1,
+            44,
+            1486,
+            62379,
+            2103487,
+            89941194,
+            3581585156,
+        )
     ),
     PerftPosition(
         name="Position 6",
         fen="r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
-        expected={
-            1: 46,
-            2: 2079,
-            3: 89890,
-            4: 3894594,
-            5: 164075551,
-            6: 6923051137,
-        }
+        expected=(
+            1,
+            46,
+            2079,
+            89890,
+            3894594,
+            164075551,
+            6923051137,
+        )
     ),
-]
+)
 
 # ============================================================================
 # Engine Communication
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
 def find_engine() -> str:
-    """Find the engine executable."""
+    """Find the engine executable. The result is cached after the first call."""
     # Priority order: Linux paths first, then Windows
     possible_paths = [
         "./output/main",
@@ -123,115 +152,420 @@ def find_engine() -> str:
     ]
 
     for path in possible_paths:
-        if os.path.exists(path):
-            # On Linux, also check if executable
-            if os.name != 'nt' and not os.access(path, os.X_OK):
-                print(f"Warning: {path} exists but is not executable. Trying chmod +x...")
-                try:
-                    os.chmod(path, 0o755)
-                except Exception as e:
-                    print(f"  Could not set executable permission: {e}")
-                    continue
-            return path
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+
+        # On Linux, also check if executable
+        if os.name != 'nt' and not st.st_mode & 0o111:
+            print(f"Warning: {path} exists but is not executable. Trying chmod +x...")
+            try:
+                os.chmod(path, 0o755)
+            except Exception as e:
+                print(f"  Could not set executable permission: {e}")
+                continue
+        return path
 
     raise FileNotFoundError("Could not find engine executable. Please compile first.")
 
 
-def run_perft(engine_path: str, fen: str, depth: int, divide: bool = False) -> int:
-    """Run perft on the engine and return the node count."""
-    command = "divide" if divide else "perft"
+ENGINE_TIMEOUT = 300  # 5 minute timeout per engine run
 
-    commands = f"position fen {fen}\n{command} {depth}\nquit\n"
 
-    try:
-        result = subprocess.run(
+class EngineProcess:
+    """Engine subprocess whose stdout is read line by line.
+
+    The commands are written up front and the caller iterates over the
+    output, stopping as soon as it has what it needs. A watchdog timer
+    kills the engine after ENGINE_TIMEOUT seconds. Engine output is plain
+    ASCII, so the pipes are binary and lines are yielded as raw bytes.
+    """
+
+    def __init__(self, engine_path: str, commands: bytes, timeout: float = ENGINE_TIMEOUT):
+        self.proc = subprocess.Popen(
             [engine_path],
-            input=commands,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
         )
+        self.timed_out = threading.Event()
+        self.watchdog = threading.Timer(timeout, self._on_timeout)
+        self.watchdog.daemon = True
+        self.watchdog.start()
+
+        self.proc.stdin.write(commands)
+        self.proc.stdin.flush()
+
+    def _on_timeout(self) -> None:
+        self.timed_out.set()
+        self.proc.kill()
+
+    def __enter__(self) -> "EngineProcess":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.watchdog.cancel()
+        self.proc.kill()
+        self.proc.wait(timeout=5)
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+
+    def __iter__(self):
+        return iter(self.proc.stdout)
+
+
+# ============================================================================
+# Perft Result Cache
+# ============================================================================
 
-        output = result.stdout
+# Perft counts are deterministic, so results are stored on disk keyed by
+# (engine hash, FEN, depth). Rebuilding the engine changes the hash, which
+# makes old entries unreachable instead of stale.
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".perft_cache.db")
 
-        # Parse the node count from output
-        for line in output.split('\n'):
-            if 'Nodes:' in line:
-                parts = line.split()
-                for i, part in enumerate(parts):
-                    if part == 'Nodes:' and i + 1 < len(parts):
-                        return int(parts[i + 1])
 
-        # If divide, the total is at the end
-        if divide:
-            print(output)
+@functools.lru_cache(maxsize=None)
+def engine_id(engine_path: str) -> str:
+    """Short SHA-256 of the engine binary."""
+    sha = hashlib.sha256()
+    with open(engine_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()[:16]
 
-        return -1
 
-    except subprocess.TimeoutExpired:
-        print(f"Error: Timeout after 5 minutes for depth {depth}")
-        return -1
+def _open_cache() -> sqlite3.Connection:
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS perft ("
+        "engine TEXT, fen TEXT, depth INTEGER, nodes INTEGER, "
+        "PRIMARY KEY (engine, fen, depth))"
+    )
+    return conn
+
+
+def cache_get(engine_path: str, fen: str, depth: int) -> Optional[int]:
+    """Return the cached node count, or None if not cached."""
+    try:
+        with contextlib.closing(_open_cache()) as conn, conn:
+            row = conn.execute(
+                "SELECT nodes FROM perft WHERE engine = ? AND fen = ? AND depth = ?",
+                (engine_id(engine_path), fen, depth)
+            ).fetchone()
+        return row[0] if row else None
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def cache_put(engine_path: str, fen: str, depth: int, nodes: int) -> None:
+    """Store a node count in the cache."""
+    try:
+        with contextlib.closing(_open_cache()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO perft VALUES (?, ?, ?, ?)",
+                (engine_id(engine_path), fen, depth, nodes)
+            )
+    except (OSError, sqlite3.Error) as e:
+        print(f"Warning: Could not write perft cache: {e}")
+
+
+# Shared library built by `make perftlib`, looked up next to the engine
+PERFT_LIB_NAMES = ("libperft.so", "perft.dll")
+
+
+def find_perft_lib(engine_path: str) -> Optional[str]:
+    """Return the path of a usable perft shared library, or None if unavailable.
+
+    The library is only used if it is at least as new as the engine binary,
+    so a stale build cannot hide a move generation change. Call this once and
+    pass the result on; worker processes only load the path they are given.
+    """
+    engine_dir = os.path.dirname(os.path.abspath(engine_path))
+    try:
+        engine_mtime = os.stat(engine_path).st_mtime
+    except OSError:
+        return None
+
+    for name in PERFT_LIB_NAMES:
+        path = os.path.join(engine_dir, name)
+        try:
+            if os.stat(path).st_mtime < engine_mtime:
+                print(f"Warning: {path} is older than the engine, not using it")
+                continue
+            load_perft_lib(path)
+        except OSError:
+            continue
+        return path
+
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_perft_lib(lib_path: str) -> ctypes.CDLL:
+    """Load the perft shared library at lib_path, once per process."""
+    lib = ctypes.CDLL(lib_path)
+    lib.perft_fen.restype = ctypes.c_uint64
+    lib.perft_fen.argtypes = [ctypes.c_char_p, ctypes.c_int]
+    return lib
+
+
+@functools.lru_cache(maxsize=64)
+def _fen_cmd(fen: str) -> bytes:
+    """Encoded 'position fen' command, reused across depths of the same FEN."""
+    return f"position fen {fen}\n".encode('ascii')
+
+
+def run_perft(engine_path: str, fen: str, depth: int, divide: bool = False, use_cache: bool = True,
+              lib_path: Optional[str] = None) -> int:
+    """Run perft on the engine and return the node count."""
+    if divide:
+        return _run_perft_engine(engine_path, fen, [depth], "divide")[0]
+    return run_perft_multi(engine_path, fen, [depth], use_cache, lib_path)[0]
+
+
+def run_perft_multi(engine_path: str, fen: str, depths: List[int], use_cache: bool = True,
+                    lib_path: Optional[str] = None) -> List[int]:
+    """Run perft at several depths in a single engine process.
+
+    If lib_path (see find_perft_lib) is given, the perft shared library is
+    called directly instead of starting the engine. Returns the node counts
+    in the same order as depths (-1 on failure). Cached depths are not run again.
+    """
+    backend = lib_path or engine_path
+
+    results: Dict[int, int] = {}
+    if use_cache:
+        for depth in depths:
+            cached = cache_get(backend, fen, depth)
+            if cached is not None:
+                results[depth] = cached
+
+    pending = [depth for depth in depths if depth not in results]
+    if pending:
+        if lib_path:
+            lib = load_perft_lib(lib_path)
+            counts = [lib.perft_fen(fen.encode('ascii'), depth) for depth in pending]
+        else:
+            counts = _run_perft_engine(engine_path, fen, pending)
+
+        for depth, nodes in zip(pending, counts):
+            results[depth] = nodes
+            if use_cache and nodes >= 0:
+                cache_put(backend, fen, depth, nodes)
+
+    return [results[depth] for depth in depths]
+
+
+def _run_perft_engine(engine_path: str, fen: str, depths: List[int], command: str = "perft") -> List[int]:
+    """Send one perft/divide command per depth and collect the Nodes: lines."""
+    commands = _fen_cmd(fen)
+    commands += "".join(f"{command} {depth}\n" for depth in depths).encode('ascii')
+    commands += b"quit\n"
+
+    nodes: List[int] = []
+    try:
+        with EngineProcess(engine_path, commands) as engine:
+            output = []
+
+            # Parse the node count from output
+            for line in engine:
+                if b'Nodes:' in line:
+                    # Format is fixed: "Nodes: <count>"
+                    nodes.append(int(line.rpartition(b':')[2]))
+                    if len(nodes) == len(depths):
+                        break
+                elif command == "divide":
+                    output.append(line)
+
+            if engine.timed_out.is_set():
+                print(f"Error: Timeout after 5 minutes for depth {depths[len(nodes)]}")
+
+            # If divide, the total is at the end
+            elif command == "divide" and not nodes:
+                print(b''.join(output).decode('ascii', 'replace'))
+
     except Exception as e:
         print(f"Error running engine: {e}")
-        return -1
+
+    return nodes + [-1] * (len(depths) - len(nodes))
+
+
+# Divide output line, e.g. "e7e8q: 1234"
+DIVIDE_LINE_RE = re.compile(rb'^([a-h][1-8][a-h][1-8][qrbn]?):\s*(\d+)')
 
 
 def run_divide(engine_path: str, fen: str, depth: int) -> Dict[str, int]:
     """Run divide on the engine and return move-node pairs."""
-    commands = f"position fen {fen}\ndivide {depth}\nquit\n"
+    commands = _fen_cmd(fen) + f"divide {depth}\nquit\n".encode('ascii')
 
     try:
-        result = subprocess.run(
-            [engine_path],
-            input=commands,
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
+        with EngineProcess(engine_path, commands) as engine:
+            moves = {}
 
-        output = result.stdout
-        moves = {}
+            for line in engine:
+                m = DIVIDE_LINE_RE.match(line)
+                if m:
+                    moves[m.group(1).decode('ascii')] = int(m.group(2))
+                elif line.startswith(b'Nodes'):
+                    break  # Total comes after the last move
 
-        for line in output.split('\n'):
-            line = line.strip()
-            if ':' in line and not line.startswith('Nodes') and not line.startswith('Time') and not line.startswith('NPS'):
-                parts = line.split(':')
-                if len(parts) == 2:
-                    move = parts[0].strip()
-                    try:
-                        nodes = int(parts[1].strip())
-                        moves[move] = nodes
-                    except ValueError:
-                        pass
+            if engine.timed_out.is_set():
+                print(f"Error: Timeout after 5 minutes for divide depth {depth}")
 
-        return moves
+            return moves
 
     except Exception as e:
         print(f"Error running divide: {e}")
         return {}
 
+# ============================================================================
+# Async Engine Pool
+# ============================================================================
+
+async def _perft_engine_worker(engine_path: str, queue: "asyncio.Queue[Tuple[int, List[int]]]",
+                               results: Dict[int, Dict[int, int]]) -> None:
+    """Drive one long-lived engine through jobs taken from queue.
+
+    The next job's commands are written before the current job's output is
+    read, so the engine never waits for Python to parse a result.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        engine_path, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+    )
+
+    def next_job() -> Optional[Tuple[int, List[int]]]:
+        try:
+            job = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        pos_idx, depths = job
+        proc.stdin.write(_fen_cmd(PERFT_POSITIONS[pos_idx].fen) +
+                         "".join(f"perft {depth}\n" for depth in depths).encode('ascii'))
+        return job
+
+    async def read_nodes(count: int) -> List[int]:
+        nodes: List[int] = []
+        while len(nodes) < count:
+            line = await proc.stdout.readline()
+            if not line:
+                break  # Engine exited
+            if b'Nodes:' in line:
+                nodes.append(int(line.rpartition(b':')[2]))
+        return nodes
+
+    try:
+        job = next_job()
+        while job is not None:
+            following = next_job()
+            await proc.stdin.drain()
+
+            pos_idx, depths = job
+            try:
+                nodes = await asyncio.wait_for(read_nodes(len(depths)), ENGINE_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Error: Timeout after 5 minutes for {PERFT_POSITIONS[pos_idx].name}")
+                nodes = []
+            results[pos_idx] = dict(zip(depths, nodes + [-1] * (len(depths) - len(nodes))))
+
+            if len(nodes) < len(depths):
+                # Engine output is out of step with the queue; leave the rest to other workers
+                if following is not None:
+                    queue.put_nowait(following)
+                break
+            job = following
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+
+
+async def _run_jobs_async(engine_path: str, perft_jobs: List[Tuple[int, List[int]]],
+                          workers: int, use_cache: bool) -> Dict[int, Dict[int, int]]:
+    """Run perft jobs on a pool of persistent engines supervised by asyncio."""
+    results: Dict[int, Dict[int, int]] = {}
+    cached: Dict[int, Dict[int, int]] = {}
+    queue: "asyncio.Queue[Tuple[int, List[int]]]" = asyncio.Queue()
+
+    for pos_idx, depths in perft_jobs:
+        fen = PERFT_POSITIONS[pos_idx].fen
+        hits = {}
+        if use_cache:
+            for depth in depths:
+                nodes = cache_get(engine_path, fen, depth)
+                if nodes is not None:
+                    hits[depth] = nodes
+        cached[pos_idx] = hits
+        pending = [depth for depth in depths if depth not in hits]
+        if pending:
+            queue.put_nowait((pos_idx, pending))
+
+    await asyncio.gather(*(
+        _perft_engine_worker(engine_path, queue, results)
+        for _ in range(min(workers, queue.qsize()))
+    ))
+
+    # Jobs left over if every worker's engine failed
+    while not queue.empty():
+        pos_idx, depths = queue.get_nowait()
+        results[pos_idx] = {depth: -1 for depth in depths}
+
+    for pos_idx, hits in cached.items():
+        fresh = results.get(pos_idx, {})
+        if use_cache:
+            for depth, nodes in fresh.items():
+                if nodes >= 0:
+                    cache_put(engine_path, PERFT_POSITIONS[pos_idx].fen, depth, nodes)
+        results[pos_idx] = {**hits, **fresh}
+
+    return results
+
+
 # ============================================================================
 # Test Runner
 # ============================================================================
 
-def test_position(engine_path: str, position: PerftPosition, max_depth: int, verbose: bool = True) -> bool:
-    """Test a single position up to max_depth."""
+def test_position(engine_path: str, position: PerftPosition, max_depth: int, verbose: bool = True,
+                  results: Optional[Dict[int, int]] = None, use_cache: bool = True, fast: bool = False,
+                  lib_path: Optional[str] = None) -> bool:
+    """Test a single position up to max_depth.
+
+    If results (depth -> nodes) is given, those node counts are reported
+    instead of running the engine again; missing depths are still run.
+
+    With fast=True only the deepest depth is run at first. The shallower
+    depths are only run if it fails, to find the first failing depth.
+    """
+    # Output is collected and written in one call per block rather than one
+    # print per line, which matters when many positions report at once
     if verbose:
-        print(f"\n{'='*60}")
-        print(f"Testing: {position.name}")
-        print(f"FEN: {position.fen}")
-        print(f"{'='*60}")
+        sys.stdout.write(f"\n{'='*60}\nTesting: {position.name}\nFEN: {position.fen}\n{'='*60}\n")
+        sys.stdout.flush()
+
+    depths = position.known_depths(max_depth)
+    results = dict(results or {})
+
+    def fill(wanted: List[int]) -> None:
+        missing = [d for d in wanted if d not in results]
+        if missing:
+            results.update(zip(missing, run_perft_multi(engine_path, position.fen, missing, use_cache, lib_path)))
+
+    fill(depths[-1:] if fast else depths)
+    if fast and depths and results[depths[-1]] != position.expected_nodes(depths[-1]):
+        fill(depths)
 
     all_passed = True
+    out: List[str] = []
 
     for depth in range(1, max_depth + 1):
-        if depth not in position.expected:
-            if verbose:
-                print(f"  Depth {depth}: No expected value, skipping")
+        expected = position.expected_nodes(depth)
+        if expected < 0:
+            out.append(f"  Depth {depth}: No expected value, skipping")
             continue
+        if depth not in results:
+            continue  # Skipped by fast mode
 
-        expected = position.expected[depth]
-        actual = run_perft(engine_path, position.fen, depth)
+        actual = results[depth]
 
         if actual == expected:
             status = "✅ PASS"
@@ -239,30 +573,75 @@ def test_position(engine_path: str, position: PerftPosition, max_depth: int, ver
             status = "❌ FAIL"
             all_passed = False
 
-        if verbose:
-            print(f"  Depth {depth}: {actual:>12,} vs {expected:>12,} expected  {status}")
+        out.append(f"  Depth {depth}: {actual:>12,} vs {expected:>12,} expected  {status}")
 
         if actual != expected:
-            if verbose:
-                print(f"           Difference: {actual - expected:+,} nodes")
+            out.append(f"           Difference: {actual - expected:+,} nodes")
             break  # Stop on first failure for this position
 
+    if verbose and out:
+        sys.stdout.write("\n".join(out) + "\n")
+
     return all_passed
 
 
-def run_all_tests(engine_path: str, max_depth: int, verbose: bool = True) -> bool:
-    """Run perft tests on all positions."""
+def _run_jobs_pool(engine_path: str, perft_jobs: List[Tuple[int, List[int]]], jobs: Optional[int],
+                   use_cache: bool, lib_path: Optional[str]) -> Dict[int, Dict[int, int]]:
+    """Run perft jobs in a process pool, one engine process (or library call) per job."""
+    results: Dict[int, Dict[int, int]] = {}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = {
+            executor.submit(run_perft_multi, engine_path, PERFT_POSITIONS[pos_idx].fen, depths, use_cache,
+                            lib_path): (pos_idx, depths)
+            for pos_idx, depths in perft_jobs
+        }
+        for future in as_completed(futures):
+            pos_idx, depths = futures[future]
+            results[pos_idx] = dict(zip(depths, future.result()))
+    return results
+
+
+def run_all_tests(engine_path: str, max_depth: int, verbose: bool = True, jobs: Optional[int] = None,
+                  use_cache: bool = True, fast: bool = False, use_async: bool = False,
+                  lib_path: Optional[str] = None) -> bool:
+    """Run perft tests on all positions.
+
+    Each position runs all of its depths in one engine process, and the
+    positions are spread over a process pool. Jobs are submitted
+    largest-first so the deep runs start early and do not end up alone at
+    the tail of the schedule. See test_position for fast mode.
+
+    With use_async=True the jobs are instead fed to a fixed set of engines
+    kept alive for the whole run and driven from a single asyncio loop; the
+    perft library is then never used, since the point is to test the engines.
+    """
     print(f"\n{'#'*60}")
     print(f"# GC-Engine Perft Test Suite")
     print(f"# Max Depth: {max_depth}")
     print(f"{'#'*60}")
 
+    perft_jobs: List[Tuple[int, List[int]]] = []
+    for pos_idx, position in enumerate(PERFT_POSITIONS):
+        depths = position.known_depths(max_depth)
+        perft_jobs.append((pos_idx, depths[-1:] if fast else depths))
+    perft_jobs.sort(
+        key=lambda job: sum(PERFT_POSITIONS[job[0]].expected_nodes(d) for d in job[1]),
+        reverse=True
+    )
+
+    if use_async:
+        lib_path = None
+        results = asyncio.run(_run_jobs_async(engine_path, perft_jobs, jobs or os.cpu_count() or 1, use_cache))
+    else:
+        results = _run_jobs_pool(engine_path, perft_jobs, jobs, use_cache, lib_path)
+
     all_passed = True
     passed_count = 0
     failed_count = 0
 
-    for position in PERFT_POSITIONS:
-        if test_position(engine_path, position, max_depth, verbose):
+    for pos_idx, position in enumerate(PERFT_POSITIONS):
+        if test_position(engine_path, position, max_depth, verbose, results[pos_idx], use_cache, fast,
+                         lib_path):
             passed_count += 1
         else:
             failed_count += 1
@@ -313,6 +692,12 @@ def main():
     parser.add_argument('--divide', action='store_true', help='Run divide instead of perft')
     parser.add_argument('--engine', '-e', type=str, default=None, help='Path to engine executable')
     parser.add_argument('--quiet', '-q', action='store_true', help='Only output failures')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the perft result cache')
+    parser.add_argument('--fast', action='store_true', help='Run only the deepest depth; run the rest only on failure')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Drive a fixed pool of persistent engines with asyncio '
+                             '(never uses the perft library)')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Parallel engine processes (default: CPU count)')
 
     args = parser.parse_args()
 
@@ -324,12 +709,16 @@ def main():
         print(f"Error: {e}")
         sys.exit(1)
 
-    # Test engine is working
-    test_result = run_perft(engine_path, PERFT_POSITIONS[0].fen, 1)
+    # Test engine is working; always run the engine itself, so neither the
+    # result cache nor the perft library can mask a broken binary
+    test_result = _run_perft_engine(engine_path, PERFT_POSITIONS[0].fen, [1])[0]
     if test_result != 20:
         print(f"Error: Engine returned {test_result} for depth 1 perft (expected 20)")
         sys.exit(1)
 
+    # Resolved once here; the worker processes are given the result
+    lib_path = None if args.use_async else find_perft_lib(engine_path)
+
     # Run tests
     if args.fen:
         # Test custom FEN
@@ -340,7 +729,7 @@ def main():
                 print(f"  {move}: {nodes:,}")
             print(f"\nTotal: {sum(moves.values()):,} nodes")
         else:
-            nodes = run_perft(engine_path, args.fen, args.depth)
+            nodes = run_perft(engine_path, args.fen, args.depth, use_cache=not args.no_cache, lib_path=lib_path)
             print(f"\nPerft {args.depth}: {nodes:,} nodes")
 
     elif args.position is not None:
@@ -357,7 +746,8 @@ def main():
                     print(f"  {move}: {nodes:,}")
                 print(f"\nTotal: {sum(moves.values()):,} nodes")
             else:
-                passed = test_position(engine_path, position, args.depth, not args.quiet)
+                passed = test_position(engine_path, position, args.depth, not args.quiet,
+                                       use_cache=not args.no_cache, fast=args.fast, lib_path=lib_path)
                 sys.exit(0 if passed else 1)
         else:
             print(f"Error: Invalid position index. Use 0-{len(PERFT_POSITIONS)-1}")
@@ -365,7 +755,8 @@ def main():
 
     else:
         # Test all positions
-        passed = run_all_tests(engine_path, args.depth, not args.quiet)
+        passed = run_all_tests(engine_path, args.depth, not args.quiet, args.jobs, not args.no_cache, args.fast,
+                               args.use_async, lib_path)
         sys.exit(0 if passed else 1)
 
 
@@ -19,11 +19,17 @@ import os
 import sys
 import json
 import math
+import operator
 import argparse
+import asyncio
 import tempfile
+import threading
+from array import array
+from collections import deque
+from itertools import repeat
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Tuple, Optional, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import time
 
 # ============================================================================
@@ -49,9 +55,34 @@ class TunableParam:
             # a should be about 10% of c
             self.a_end = self.c_end * 0.1
 
-    def clamp(self, val: float) -> float:
-        """Clamp value to valid range."""
-        return max(self.min_val, min(self.max_val, val))
+
+class ParamTable:
+    """
+    Tunable parameters stored as parallel arrays.
+
+    Every SPSA iteration reads and clamps each parameter several times, so the
+    numeric fields are kept in flat array('d') storage indexed by parameter
+    position instead of in one TunableParam object per parameter.
+    """
+
+    def __init__(self, params: List[TunableParam]):
+        self.names = [p.name for p in params]
+        self.values = array('d', (p.value for p in params))
+        self.min_vals = array('d', (p.min_val for p in params))
+        self.max_vals = array('d', (p.max_val for p in params))
+        self.c_end = array('d', (p.c_end for p in params))
+        self.a_end = array('d', (p.a_end for p in params))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def clamp(self, values: Iterable[float]) -> array:
+        """Clamp each value to its parameter's valid range."""
+        return array('d', map(min, self.max_vals, map(max, self.min_vals, values)))
+
+    def as_dict(self, values: Optional[Iterable[float]] = None) -> Dict[str, float]:
+        """Map parameter names to values (current values by default)."""
+        return dict(zip(self.names, self.values if values is None else values))
 
 
 # Default parameters to tune (matching tuning.cpp in the engine)
@@ -103,23 +134,177 @@ DEFAULT_PARAMS = [
 ]
 
 
+# ============================================================================
+# Engine Communication
+# ============================================================================
+
+class UCIEngine:
+    """
+    Long-lived UCI engine process used for simple-mode evaluations.
+
+    The engine is started and put through the uci handshake once, then
+    reused for every evaluation, so process startup is not paid per call.
+    """
+
+    EVAL_TIMEOUT = 15  # seconds per evaluation
+    HASH_MB = 16       # shallow searches need little hash, and many engines may run at once
+
+    # Encoded "setoption name <param> value %d" lines, shared by all engines
+    _setoption_cmds: Dict[str, bytes] = {}
+
+    def __init__(self, engine_path: str):
+        self.engine_path = engine_path
+        self.proc: Optional[subprocess.Popen] = None
+        self._last_opts: Dict[str, int] = {}  # option values the running process has seen
+
+    def start(self):
+        """Start the engine and wait for uciok; raises OSError if the engine exits first."""
+        self.proc = subprocess.Popen(
+            [self.engine_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._send("uci")
+        for line in iter(self.proc.stdout.readline, b''):
+            if line.startswith(b"uciok"):
+                break
+        else:
+            raise OSError("engine exited before uciok")
+        self._send(f"setoption name Hash value {self.HASH_MB}")
+        self._last_opts = {}
+
+    def _kill(self):
+        proc = self.proc  # runs on the watchdog thread; read the attribute once
+        if proc is not None:
+            proc.kill()
+
+    def _discard(self):
+        """Kill and reap the engine so the next evaluation starts a new one."""
+        if self.proc is not None:
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+
+    def _send(self, *commands: str):
+        self.proc.stdin.write(("\n".join(commands) + "\n").encode('ascii'))
+        self.proc.stdin.flush()
+
+    def evaluate(self, params: Dict[str, float], fen: str, depth: int) -> int:
+        """
+        Search fen to depth with params set and return the last reported score in cp.
+
+        Returns 0 if the engine fails to start, crashes or times out.
+        """
+        # Kill a hung startup or search; the engine is restarted on the next call
+        watchdog = threading.Timer(self.EVAL_TIMEOUT, self._kill)
+        watchdog.start()
+        try:
+            if self.proc is None or self.proc.poll() is not None:
+                self.start()
+
+            # Only send options whose integer value differs from what the engine has
+            changed = {k: int(v) for k, v in params.items() if self._last_opts.get(k) != int(v)}
+            self._last_opts.update(changed)
+
+            # Build the whole request as bytes and send it in one write
+            cmds = self._setoption_cmds
+            request = b"".join(
+                (cmds.get(k) or cmds.setdefault(k, f"setoption name {k} value %d\n".encode('ascii'))) % v
+                for k, v in changed.items()
+            )
+            # Start every search from a cleared hash and history, as a fresh engine
+            # would: state left from the previous FEN can shift the result by far
+            # more than the plus/minus signal being measured
+            request += b"ucinewgame\nisready\nposition fen %b\ngo depth %d\n" % (fen.encode('ascii'), depth)
+
+            self.proc.stdin.write(request)
+            self.proc.stdin.flush()
+
+            # Track the score of the latest info line until bestmove arrives
+            # UCI output is ASCII, so work on bytes and skip decoding
+            score = 0
+            for line in iter(self.proc.stdout.readline, b''):
+                if line.startswith(b'info') and b' score ' in line and not line.startswith(b'info string'):
+                    tokens = line.split()
+                    i = tokens.index(b'score')
+                    value = int(tokens[i + 2])
+                    if tokens[i + 1] == b'cp':
+                        score = value
+                    elif tokens[i + 1] == b'mate':
+                        score = 10000 if value > 0 else -10000
+                elif line.startswith(b'bestmove'):
+                    return score
+        except (OSError, ValueError, IndexError):
+            pass
+        finally:
+            watchdog.cancel()
+
+        # Engine exited, was killed, or sent output we could not parse. Its
+        # stdout may still hold the rest of this search, so never reuse it.
+        self._discard()
+        return 0
+
+    def quit(self):
+        """Ask the engine to exit and wait for it."""
+        if self.proc is None:
+            return
+        try:
+            self._send("quit")
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+
 # ============================================================================
 # SPSA Algorithm Implementation
 # ============================================================================
 
+# Parsed EPD positions keyed by (absolute epd path, fen_count), shared by all
+# tuner instances in the process so the file is only read once
+_EPD_CACHE: Dict[Tuple[str, int], List[str]] = {}
+
+
+def spsa_update(values: array, delta: List[int], score_diff: float, a_k: float, c_k: float,
+                a_end: array, c_end: array, min_vals: array, max_vals: array) -> None:
+    """
+    Apply one SPSA gradient step to values in place.
+
+    The gradient estimate, step and clamp are fused into a single pass over
+    the flat arrays so no intermediate lists are built per iteration.
+    """
+    for i in range(len(values)):
+        gradient = score_diff / (2 * c_k * c_end[i] * delta[i])
+        value = values[i] + a_k * a_end[i] * gradient
+        values[i] = min(max_vals[i], max(min_vals[i], value))
+
+
 class SPSATuner:
     """SPSA tuner for chess engine parameters."""
 
+    EVAL_DIFF_CLIP = 800       # cp; larger per-position differences are mostly mate scores
+    # Logistic expected score (100cp scaling) for every clipped integer eval
+    # difference d, at index d + EVAL_DIFF_CLIP
+    EXPECTED_SCORE = tuple(1 / (1 + 10 ** (-d / 100)) for d in range(-EVAL_DIFF_CLIP, EVAL_DIFF_CLIP + 1))
+    GAMES_TIMEOUT = 3600       # seconds per cutechess run
+    HISTORY_TAIL = 100         # in-memory history entries when streaming to history_path
+
     def __init__(self,
                  engine_path: str,
                  params: List[TunableParam],
                  games_per_iter: int = 100,
                  time_control: str = "1+0.1",
-                 concurrency: int = 1,
+                 concurrency: int = 0,
                  cutechess_path: str = "cutechess-cli",
                  fen_count: int = 500,
                  positions_per_iter: int = 20,
-                 search_depth: int = 4):
+                 search_depth: int = 4,
+                 seed: Optional[int] = None,
+                 openings: Optional[str] = None,
+                 adaptive_depth: bool = True,
+                 history_path: Optional[str] = None):
         """
         Initialize SPSA tuner.
 
@@ -128,18 +313,33 @@ class SPSATuner:
             params: List of parameters to tune
             games_per_iter: Number of games per iteration (must be even)
             time_control: Time control string (e.g., "1+0.1" = 1s + 0.1s increment)
-            concurrency: Number of concurrent games
+            concurrency: Number of concurrent games, or engine pairs in simple mode
+                         (0 = one per CPU core). At least twice games_per_iter
+                         runs several full-mode matches per iteration.
             cutechess_path: Path to cutechess-cli
+            seed: Random seed for perturbations and position sampling, reseeded
+                  per iteration (None = random)
+            openings: Opening book (.pgn or .epd) for full-mode games (None = start position)
+            adaptive_depth: In simple mode, search shallower in early iterations and
+                            reach search_depth by iteration 31
+            history_path: JSONL file that each iteration's result is appended to as it
+                          completes (earlier runs' lines are kept); only the last
+                          HISTORY_TAIL results stay in memory
         """
-        self.engine_path = os.path.abspath(engine_path)
-        self.params = params
+        # Resolved once; every engine and cutechess launch reuses this path
+        self.engine_path = os.path.realpath(engine_path)
+        self.params = ParamTable(params)
         self.games_per_iter = games_per_iter if games_per_iter % 2 == 0 else games_per_iter + 1
         self.time_control = time_control
-        self.concurrency = concurrency
+        self.concurrency = concurrency if concurrency > 0 else (os.cpu_count() or 1)
         self.cutechess_path = cutechess_path
         self.fen_count = fen_count
         self.positions_per_iter = positions_per_iter
         self.search_depth = search_depth
+        self.adaptive_depth = adaptive_depth
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.openings = openings
 
         # SPSA hyperparameters
         self.A = 10              # Stability constant (iterations)
@@ -148,21 +348,44 @@ class SPSATuner:
 
         # Results tracking
         self.iteration = 0
-        self.current_params = {p.name: p.value for p in params}  # Current/final params
-        self.best_params = {p.name: p.value for p in params}     # Best params seen
+        self.current_params = self.params.as_dict()  # Current/final params
+        self.best_params = self.params.as_dict()     # Best params seen
         self.best_score = 0.5    # Track best score seen
         self.best_iteration = 0  # When best score was found
-        self.history: List[Dict] = []
+        self.history_path = history_path
+        self.history: "deque[Dict]" = deque(maxlen=self.HISTORY_TAIL if history_path else None)
+        # Each iteration appends its line as soon as it finishes, so it is on disk
+        # even if the run dies. Appending keeps an earlier (possibly crashed) run's
+        # lines; this run's lines start at _history_start.
+        self._history_start = (os.path.getsize(history_path)
+                               if history_path and os.path.exists(history_path) else 0)
+
+        # More cores than one match can use: full mode plays this many
+        # independent perturbations per iteration and averages their steps
+        # (mini-batch SPSA), sharing the cores between the matches
+        self.game_streams = max(1, self.concurrency // self.games_per_iter)
+
+        # cutechess arguments that are the same for every iteration
+        self._cutechess_args = self._build_cutechess_args()
 
         # Pre-load EPD positions (once, not every iteration)
         self.test_positions = self._load_epd_positions()
 
+        # Persistent engines for simple mode (see _run_games_simple)
+        self._engines: List[Tuple[UCIEngine, UCIEngine]] = []
+        self._executor: Optional[ThreadPoolExecutor] = None  # drives the engine pairs
+
     def _load_epd_positions(self) -> List[str]:
         """Load test positions from EPD file."""
         # Try to find EPD file
         epd_path = os.path.join(os.path.dirname(__file__), "quiet-labeled.epd")
         if not os.path.exists(epd_path):
             epd_path = os.path.join(os.path.dirname(self.engine_path), "..", "tuner", "quiet-labeled.epd")
+        epd_path = os.path.abspath(epd_path)
+
+        cache_key = (epd_path, self.fen_count)
+        if cache_key in _EPD_CACHE:
+            return _EPD_CACHE[cache_key]
 
         positions = []
 
@@ -185,6 +408,8 @@ class SPSATuner:
                                     fen += " 0 1"
                                 positions.append(fen)
                 print(f"Loaded {len(positions)} positions")
+                if positions:
+                    _EPD_CACHE[cache_key] = positions
             except Exception as e:
                 print(f"Warning: Could not load EPD file: {e}")
 
@@ -210,75 +435,113 @@ class SPSATuner:
 
     def _generate_perturbation(self) -> List[int]:
         """Generate random perturbation vector (+1 or -1 for each parameter)."""
-        return [2 * random.randint(0, 1) - 1 for _ in self.params]
+        # One call draws a random bit per parameter
+        n = len(self.params)
+        bits = self.rng.getrandbits(n)
+        return [((bits >> i) & 1) * 2 - 1 for i in range(n)]
 
     def _build_engine_options(self, perturbed_values: Dict[str, float]) -> str:
         """Build UCI setoption commands string."""
-        options = []
-        for name, value in perturbed_values.items():
-            options.append(f"option.{name}={int(value)}")
-        return " ".join(options)
+        return " ".join(f"option.{name}={int(value)}" for name, value in perturbed_values.items())
+
+    def _build_cutechess_args(self) -> Tuple[str, ...]:
+        """Build the cutechess arguments that do not depend on the parameters."""
+        # Games are played in pairs: -repeat plays each opening twice with
+        # colors swapped, so both sides see the same positions and the
+        # opening's bias cancels out of the score difference
+        args = [
+            # restart=off keeps each engine process alive across games (ucinewgame only)
+            "-each", f"tc={self.time_control}", "proto=uci", "restart=off",
+            "-games", "2",
+            "-rounds", str(self.games_per_iter // 2),
+            "-repeat",
+            "-concurrency", str(self.concurrency // self.game_streams),
+            "-recover",
+            "-wait", "100",
+        ]
+        if self.openings:
+            book_format = "epd" if self.openings.lower().endswith(".epd") else "pgn"
+            args += ["-openings", f"file={self.openings}", f"format={book_format}", "order=random"]
+        return tuple(args)
 
-    def _run_games(self, params_plus: Dict[str, float], params_minus: Dict[str, float]) -> Tuple[float, float]:
+    def _run_games(self, pairs: List[Tuple[Dict[str, float], Dict[str, float]]]) -> List[Tuple[float, float]]:
         """
-        Run games between two parameter sets.
+        Run one cutechess match per (params_plus, params_minus) pair, all at once.
 
         Returns:
-            (score_plus, score_minus): Scores as ratio [0, 1]
+            (score_plus, score_minus) per pair: Scores as ratio [0, 1]
         """
+        async def play_all():
+            return await asyncio.gather(*(
+                self._play_games(plus, minus, stream) for stream, (plus, minus) in enumerate(pairs)
+            ))
+
+        return asyncio.run(play_all())
+
+    async def _play_games(self, params_plus: Dict[str, float], params_minus: Dict[str, float],
+                          stream: int = 0) -> Tuple[float, float]:
+        """Play one cutechess match between two parameter sets."""
+        # Matches run concurrently, so each writes its own PGN
+        pgn_path = "spsa_games.pgn" if stream == 0 else f"spsa_games.{stream}.pgn"
+
         # Build option strings
         opts_plus = self._build_engine_options(params_plus)
         opts_minus = self._build_engine_options(params_minus)
 
-        half_games = self.games_per_iter // 2
-
         # Run games: plus vs minus
         cmd = [
             self.cutechess_path,
             "-engine", f"cmd={self.engine_path}", opts_plus, "name=Plus",
             "-engine", f"cmd={self.engine_path}", opts_minus, "name=Minus",
-            "-each", f"tc={self.time_control}", "proto=uci",
-            "-games", str(half_games),
-            "-rounds", str(half_games),
-            "-concurrency", str(self.concurrency),
-            "-pgnout", "spsa_games.pgn",
-            "-recover",
-            "-wait", "100",
+            *self._cutechess_args,
+            "-pgnout", pgn_path,
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600)
-            output = result.stdout
-
-            # Parse results
-            wins_plus = 0
-            draws = 0
-            wins_minus = 0
+            # Stream cutechess output instead of buffering all of it; only the
+            # score lines matter, and stderr is not read at all
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            print(f"Error running games: {e}")
+            return 0.5, 0.5
 
-            for line in output.split('\n'):
-                if 'Score of Plus vs Minus' in line:
+        async def read_score() -> Tuple[int, int, int]:
+            wins_plus = wins_minus = draws = 0
+            # cutechess prints the running score after every game; keep the last.
+            # The pipe is drained to the end so cutechess can finish the PGN.
+            async for line in proc.stdout:
+                if line.startswith(b'Score of Plus vs Minus'):
                     # Format: "Score of Plus vs Minus: X - Y - Z [ratio]"
-                    parts = line.split(':')[1].strip().split()
+                    parts = line.split(b':')[1].split()
                     wins_plus = int(parts[0])
                     wins_minus = int(parts[2])
                     draws = int(parts[4])
-                    break
-
-            total = wins_plus + wins_minus + draws
-            if total == 0:
-                return 0.5, 0.5
-
-            score_plus = (wins_plus + draws * 0.5) / total
-            score_minus = (wins_minus + draws * 0.5) / total
+            await proc.wait()
+            return wins_plus, wins_minus, draws
 
-            return score_plus, score_minus
-
-        except subprocess.TimeoutExpired:
+        try:
+            wins_plus, wins_minus, draws = await asyncio.wait_for(read_score(), self.GAMES_TIMEOUT)
+        except asyncio.TimeoutError:
             print("Warning: Game timeout, returning draw")
             return 0.5, 0.5
         except Exception as e:
             print(f"Error running games: {e}")
             return 0.5, 0.5
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+        total = wins_plus + wins_minus + draws
+        if total == 0:
+            return 0.5, 0.5
+
+        score_plus = (wins_plus + draws * 0.5) / total
+        score_minus = (wins_minus + draws * 0.5) / total
+
+        return score_plus, score_minus
 
     def _run_games_simple(self, params_plus: Dict[str, float], params_minus: Dict[str, float]) -> Tuple[float, float]:
         """
@@ -290,65 +553,59 @@ class SPSATuner:
         """
         # Sample random positions from pre-loaded set
         sample_size = min(self.positions_per_iter, len(self.test_positions))
-        TEST_POSITIONS = random.sample(self.test_positions, sample_size)
-
-        def get_eval(params: Dict[str, float], fen: str) -> float:
-            """Run engine and get evaluation of a position."""
-            cmd = [self.engine_path]
-            opts = "\n".join([f"setoption name {k} value {int(v)}" for k, v in params.items()])
-
-            # Use 'fen' for FEN positions
-            pos_cmd = f"position fen {fen}"
-            input_str = f"uci\n{opts}\nisready\n{pos_cmd}\ngo depth {self.search_depth}\n"
-
-            try:
-                proc = subprocess.run(
-                    cmd,
-                    input=input_str,
-                    capture_output=True,
-                    text=True,
-                    timeout=15
-                )
-
-                # Parse score from output (get last depth's score)
-                for line in reversed(proc.stdout.split('\n')):
-                    if 'score cp' in line:
-                        parts = line.split('score cp ')
-                        if len(parts) > 1:
-                            score = int(parts[1].split()[0])
-                            return score
-                    elif 'score mate' in line:
-                        parts = line.split('score mate ')
-                        if len(parts) > 1:
-                            mate = int(parts[1].split()[0])
-                            return 10000 if mate > 0 else -10000
-                return 0
-            except:
-                return 0
-
-        # Get evaluations for both parameter sets across all positions
-        total_diff = 0.0
-        positions_tested = 0
-
-        for fen in TEST_POSITIONS:
-            eval_plus = get_eval(params_plus, fen)
-            eval_minus = get_eval(params_minus, fen)
-
-            # Accumulate signed difference (plus - minus)
-            diff = eval_plus - eval_minus
-            total_diff += diff
-            positions_tested += 1
-
-        # Average difference across positions
-        avg_diff = total_diff / max(1, positions_tested)
-
-        # Convert eval difference to expected score (logistic function)
-        # Using 100cp scaling for sensitivity
-        score_plus = 1 / (1 + 10 ** (-avg_diff / 100))  # More sensitive scaling
+        TEST_POSITIONS = self.rng.sample(self.test_positions, sample_size)
+
+        # Pairs of persistent engines (plus, minus), one pair per concurrent
+        # evaluation; engines start on first use and stay up across iterations
+        if not self._engines:
+            self._engines = [
+                (UCIEngine(self.engine_path), UCIEngine(self.engine_path))
+                for _ in range(self.concurrency)
+            ]
+            # Threads are enough here: the work happens in the engine processes
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        depth = self._eval_depth()
+
+        # Get evaluations for both parameter sets across all positions. Pair i
+        # always gets positions i, i+n, i+2n, ... in order, so a seeded run
+        # does not depend on thread scheduling.
+        n = len(self._engines)
+        diffs = [d for chunk in self._executor.map(
+            self._eval_diffs, self._engines, [TEST_POSITIONS[i::n] for i in range(n)],
+            repeat(depth), repeat(params_plus), repeat(params_minus),
+        ) for d in chunk]
+
+        # Convert each position's eval difference to an expected score
+        # (logistic, 100cp scaling) and average. Clipping keeps mate scores
+        # from dominating the estimate.
+        if not diffs:
+            return 0.5, 0.5
+        clip = self.EVAL_DIFF_CLIP
+        lut = self.EXPECTED_SCORE
+        score_plus = math.fsum(lut[max(-clip, min(clip, d)) + clip] for d in diffs) / len(diffs)
         score_minus = 1 - score_plus
 
         return score_plus, score_minus
 
+    def _eval_depth(self) -> int:
+        """Search depth for simple-mode evaluations in the current iteration."""
+        if not self.adaptive_depth:
+            return self.search_depth
+        # Early gradients are coarse anyway: one ply less per 20 iterations
+        # before iteration 50, never below depth 2
+        reduction = max(0, (50 - self.iteration) // 20)
+        return min(self.search_depth, max(2, self.search_depth - reduction))
+
+    def _eval_diffs(self, engines: Tuple[UCIEngine, UCIEngine], fens: List[str], depth: int,
+                    params_plus: Dict[str, float], params_minus: Dict[str, float]) -> List[int]:
+        """Return eval_plus - eval_minus for each of fens, in order, on one engine pair."""
+        engine_plus, engine_minus = engines
+        return [
+            engine_plus.evaluate(params_plus, fen, depth) - engine_minus.evaluate(params_minus, fen, depth)
+            for fen in fens
+        ]
+
     def iterate(self, use_simple_games: bool = False) -> Dict:
         """
         Run one SPSA iteration.
@@ -362,36 +619,45 @@ class SPSATuner:
         self.iteration += 1
         k = self.iteration
 
+        # With a fixed seed, every iteration draws from its own stream, so
+        # iteration k's perturbation and sample depend only on (seed, k)
+        if self.seed is not None:
+            self.rng.seed(f"{self.seed}:{k}")
+
         # Get SPSA coefficients
         a_k, c_k = self._get_spsa_coefficients(k)
 
-        # Generate perturbation
-        delta = self._generate_perturbation()
-
-        # Create perturbed parameter sets
-        params_plus = {}
-        params_minus = {}
-
-        for i, param in enumerate(self.params):
-            perturbation = c_k * param.c_end * delta[i]
-            params_plus[param.name] = param.clamp(param.value + perturbation)
-            params_minus[param.name] = param.clamp(param.value - perturbation)
+        table = self.params
+
+        # Generate perturbations and perturbed parameter sets; full mode may
+        # play several independent perturbations per iteration (see __init__)
+        streams = 1 if use_simple_games else self.game_streams
+        deltas = []
+        pairs = []
+        for _ in range(streams):
+            delta = self._generate_perturbation()
+            perturbation = [c_k * c * d for c, d in zip(table.c_end, delta)]
+            params_plus = table.as_dict(table.clamp(map(operator.add, table.values, perturbation)))
+            params_minus = table.as_dict(table.clamp(map(operator.sub, table.values, perturbation)))
+            deltas.append(delta)
+            pairs.append((params_plus, params_minus))
 
         # Run games
         if use_simple_games:
-            score_plus, score_minus = self._run_games_simple(params_plus, params_minus)
+            scores = [self._run_games_simple(*pairs[0])]
         else:
-            score_plus, score_minus = self._run_games(params_plus, params_minus)
+            scores = self._run_games(pairs)
 
-        # Calculate gradient and update parameters
-        for i, param in enumerate(self.params):
-            if delta[i] != 0:
-                gradient = (score_plus - score_minus) / (2 * c_k * param.c_end * delta[i])
-                step = a_k * param.a_end * gradient
-                param.value = param.clamp(param.value + step)
+        # Calculate gradient and update parameters, averaging the steps of
+        # all streams
+        for delta, (score_plus, score_minus) in zip(deltas, scores):
+            spsa_update(table.values, delta, score_plus - score_minus, a_k / streams, c_k,
+                        table.a_end, table.c_end, table.min_vals, table.max_vals)
+        score_plus = math.fsum(plus for plus, _ in scores) / streams
+        score_minus = math.fsum(minus for _, minus in scores) / streams
 
         # Update current/final params
-        self.current_params = {p.name: p.value for p in self.params}
+        self.current_params = table.as_dict()
 
         # Track best score (when plus score is significantly better)
         combined_score = score_plus
@@ -410,6 +676,9 @@ class SPSATuner:
             "params": dict(self.current_params),
         }
         self.history.append(result)
+        if self.history_path:
+            with open(self.history_path, 'a') as f:
+                f.write(json.dumps(result) + "\n")
 
         return result
 
@@ -426,26 +695,46 @@ class SPSATuner:
         """
         print(f"Starting SPSA tuning for {iterations} iterations...")
         print(f"Engine: {self.engine_path}")
-        print(f"Parameters: {[p.name for p in self.params]}")
+        print(f"Parameters: {self.params.names}")
         print()
 
-        for i in range(iterations):
-            result = self.iterate(use_simple_games)
+        try:
+            for i in range(iterations):
+                result = self.iterate(use_simple_games)
 
-            print(f"[{i+1}/{iterations}] Plus: {result['score_plus']:.3f}, "
-                  f"Minus: {result['score_minus']:.3f}, Best: {self.best_score:.3f} @ iter {self.best_iteration}")
+                print(f"[{i+1}/{iterations}] Plus: {result['score_plus']:.3f}, "
+                      f"Minus: {result['score_minus']:.3f}, Best: {self.best_score:.3f} @ iter {self.best_iteration}")
 
-            # Print current best values every 10 iterations
-            if (i + 1) % 10 == 0:
-                print("\nCurrent parameter values:")
-                for p in self.params:
-                    print(f"  {p.name}: {int(p.value)}")
-                print()
+                # Print current best values every 10 iterations
+                if (i + 1) % 10 == 0:
+                    print("\nCurrent parameter values:")
+                    for name, value in self.current_params.items():
+                        print(f"  {name}: {int(value)}")
+                    print()
+        finally:
+            self.close()
 
         return self.current_params  # Return final params after all iterations
 
+    def close(self):
+        """Shut down any persistent engines."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for engine_plus, engine_minus in self._engines:
+            engine_plus.quit()
+            engine_minus.quit()
+        self._engines = []
+
     def save_results(self, filename: str = "spsa_results.json"):
         """Save tuning results to JSON file."""
+        if self.history_path and os.path.exists(self.history_path):
+            with open(self.history_path, 'rb') as f:
+                f.seek(self._history_start)
+                history = [json.loads(line) for line in f]
+        else:
+            history = list(self.history)
+
         output = {
             "summary": {
                 "total_iterations": self.iteration,
@@ -455,7 +744,7 @@ class SPSATuner:
             "final_params": {k: int(v) for k, v in self.current_params.items()},
             "best_params": {k: int(v) for k, v in self.best_params.items()},
             "initial_params": {p.name: int(p.min_val + (p.max_val - p.min_val) / 2) for p in DEFAULT_PARAMS},
-            "history": self.history,
+            "history": history,
         }
         with open(filename, 'w') as f:
             json.dump(output, f, indent=2)
@@ -491,10 +780,14 @@ def main():
     parser.add_argument("--search-depth", type=int, default=4, help="Search depth for evaluation")
     parser.add_argument("--games-per-iter", type=int, default=100, help="Games per iteration (full mode)")
     parser.add_argument("--time-control", default="1+0.1", help="Time control (e.g., 1+0.1)")
-    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent games")
+    parser.add_argument("--concurrency", type=int, default=0, help="Concurrent games (default: CPU count)")
     parser.add_argument("--cutechess", default="cutechess-cli", help="Path to cutechess-cli")
     parser.add_argument("--simple", action="store_true", help="Use simple eval comparison (no cutechess)")
     parser.add_argument("--output", default="spsa_results.json", help="Output file")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (default: random)")
+    parser.add_argument("--fixed-depth", action="store_true",
+                        help="Always search at --search-depth (default: shallower early iterations)")
+    parser.add_argument("--openings", default=None, help="Opening book .pgn/.epd for full mode (default: none)")
 
     args = parser.parse_args()
 
@@ -514,6 +807,10 @@ def main():
         fen_count=args.fen_count,
         positions_per_iter=args.positions_per_iter,
         search_depth=args.search_depth,
+        seed=args.seed,
+        openings=args.openings,
+        adaptive_depth=not args.fixed_depth,
+        history_path=os.path.splitext(args.output)[0] + ".jsonl",
     )
 
     # Run tuning